@@ -1,8 +1,721 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sqlite3
+import os
+import glob
+import threading
+import unicodedata
+import zlib
 from datetime import datetime, timedelta
 
+DB_PATH = 'library.db'
+ARCHIVE_PATH = 'library_archive.db'
+ARCHIVE_AFTER_MONTHS = 12                 # Returned loans older than this leave the hot table
+BACKUP_DIR = 'backups'
+BACKUP_KEEP = 10                          # Number of snapshots to retain
+BACKUP_INTERVAL_MS = 6 * 60 * 60 * 1000   # Scheduled snapshot every 6 hours
+BACKUP_PAGES_PER_STEP = 256               # Pages copied before yielding to writers
+RECLAIM_THRESHOLD = 64                    # Free pages before incremental vacuum
+DUPLICATE_THRESHOLD = 0.5                 # Title trigram similarity for possible duplicates
+MINHASH_BANDS = 8                         # LSH bands; more bands find more candidate pairs
+MINHASH_ROWS = 2                          # Hashes per band
+RECOMMENDATION_COUNT = 5                  # Books shown in "also borrowed" lists
+
+
+class CirculationError(Exception):
+    """Raised when a circulation request cannot be carried out"""
+
+
+class BookUnavailableError(CirculationError):
+    """Raised when no copy of a book is free to issue"""
+
+
+def open_database(path=DB_PATH, archive_path=ARCHIVE_PATH):
+    """Open the library database, creating tables, indexes and views as needed"""
+    conn = sqlite3.connect(path, timeout=10)
+    cursor = conn.cursor()
+    
+    # Incremental auto-vacuum lets deleted pages be reclaimed without a full VACUUM.
+    # Existing databases need one VACUUM for the setting to take effect.
+    cursor.execute("PRAGMA auto_vacuum")
+    if cursor.fetchone()[0] != 2:
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+    
+    # WAL mode lets online backups read while the app keeps writing
+    cursor.execute("PRAGMA journal_mode = WAL")
+    
+    # Create Books table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS books (
+            book_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            isbn TEXT UNIQUE,
+            category TEXT,
+            quantity INTEGER DEFAULT 1,
+            available INTEGER DEFAULT 1
+        )
+    ''')
+    
+    # Normalized ISBN-13 key; blank and malformed ISBNs stay NULL so they never collide
+    cursor.execute("PRAGMA table_info(books)")
+    if 'isbn13' not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE books ADD COLUMN isbn13 TEXT")
+        cursor.execute("UPDATE books SET isbn=NULL WHERE TRIM(isbn)=''")
+        
+        # Backfill existing rows; later copies of the same ISBN are left for the duplicate finder
+        cursor.execute("SELECT book_id, isbn FROM books WHERE isbn IS NOT NULL ORDER BY book_id")
+        seen = set()
+        for book_id, isbn in cursor.fetchall():
+            try:
+                key = normalize_isbn(isbn)
+            except ValueError:
+                continue
+            if key not in seen:
+                seen.add(key)
+                cursor.execute("UPDATE books SET isbn13=? WHERE book_id=?", (key, book_id))
+    
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_books_isbn13 ON books (isbn13)
+    ''')
+    
+    # Create Members table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS members (
+            member_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE,
+            phone TEXT,
+            join_date TEXT
+        )
+    ''')
+    
+    # Create Transactions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INTEGER,
+            member_id INTEGER,
+            issue_date TEXT,
+            due_date TEXT,
+            return_date TEXT,
+            status TEXT DEFAULT 'Issued',
+            FOREIGN KEY (book_id) REFERENCES books(book_id),
+            FOREIGN KEY (member_id) REFERENCES members(member_id)
+        )
+    ''')
+    
+    # Create Holds table (per-book FIFO reservation queue)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS holds (
+            hold_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INTEGER,
+            member_id INTEGER,
+            created_at TEXT,
+            ready_date TEXT,
+            status TEXT DEFAULT 'Waiting',
+            FOREIGN KEY (book_id) REFERENCES books(book_id),
+            FOREIGN KEY (member_id) REFERENCES members(member_id)
+        )
+    ''')
+    
+    # Partial indexes only cover open holds, so they stay small as fulfilled holds pile up
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_holds_queue
+        ON holds (book_id, created_at) WHERE status='Waiting'
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_holds_ready
+        ON holds (book_id, member_id) WHERE status='Ready'
+    ''')
+    
+    # Copies set aside and waiting to be collected
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS pending_pickups AS
+        SELECT h.hold_id, h.book_id, b.title, h.member_id, m.name, h.ready_date, h.status
+        FROM holds h
+        JOIN books b ON b.book_id = h.book_id
+        JOIN members m ON m.member_id = h.member_id
+        WHERE h.status='Ready'
+    ''')
+    
+    # Lets archiving find old returned loans without scanning the table
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transactions_returned
+        ON transactions (status, return_date)
+    ''')
+    
+    # Lets recommendations look up a member's borrowing history
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_transactions_member
+        ON transactions (member_id, book_id)
+    ''')
+    
+    # Co-borrowing counts: how many members borrowed both book_id and other_id
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='co_borrows'")
+    build_co_borrows = cursor.fetchone() is None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS co_borrows (
+            book_id INTEGER,
+            other_id INTEGER,
+            members INTEGER,
+            PRIMARY KEY (book_id, other_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Serves top-N lookups straight from the index
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_co_borrows_top
+        ON co_borrows (book_id, members DESC)
+    ''')
+    
+    conn.commit()
+    
+    # Attach archive database holding old returned loans
+    cursor.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    cursor.execute("PRAGMA archive.journal_mode = WAL")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive.transactions (
+            transaction_id INTEGER PRIMARY KEY,
+            book_id INTEGER,
+            member_id INTEGER,
+            issue_date TEXT,
+            due_date TEXT,
+            return_date TEXT,
+            status TEXT DEFAULT 'Returned'
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_member
+        ON transactions (member_id, book_id)
+    ''')
+    
+    # Full history across both databases (views spanning attached databases must be TEMP)
+    cursor.execute('''
+        CREATE TEMP VIEW IF NOT EXISTS transaction_history AS
+        SELECT * FROM main.transactions
+        UNION ALL
+        SELECT * FROM archive.transactions
+    ''')
+    
+    conn.commit()
+    
+    if build_co_borrows:
+        rebuild_co_borrows(conn)
+    
+    return conn
+
+
+def begin_write(conn):
+    """Start a write transaction, first discarding a failed statement left open on the connection"""
+    # sqlite3 opens a transaction for any INSERT/UPDATE/DELETE, even one that then fails
+    if conn.in_transaction:
+        conn.rollback()
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def issue_loan(conn, book_id, member_id, due_days=14):
+    """Issue a book to a member and return the due date"""
+    cursor = conn.cursor()
+    
+    # Take the write lock before reading availability so two desks cannot both take the last copy
+    begin_write(conn)
+    try:
+        # Check if book exists
+        cursor.execute("SELECT available FROM books WHERE book_id=?", (book_id,))
+        result = cursor.fetchone()
+        if not result:
+            raise CirculationError("Book ID not found!")
+        
+        # Check if member exists
+        cursor.execute("SELECT member_id FROM members WHERE member_id=?", (member_id,))
+        if not cursor.fetchone():
+            raise CirculationError("Member ID not found!")
+        
+        # A copy already set aside for this member does not count against availability
+        cursor.execute('''
+            SELECT hold_id FROM holds WHERE book_id=? AND member_id=? AND status='Ready'
+        ''', (book_id, member_id))
+        hold = cursor.fetchone()
+        
+        if not hold and result[0] <= 0:
+            raise BookUnavailableError("Book is not available!")
+        
+        # Must run before the loan is recorded so a first borrow can be told from a repeat
+        record_co_borrow(cursor, book_id, member_id)
+        
+        # Issue the book
+        issue_date = datetime.now().strftime("%Y-%m-%d")
+        due_date = (datetime.now() + timedelta(days=due_days)).strftime("%Y-%m-%d")
+        
+        cursor.execute('''
+            INSERT INTO transactions (book_id, member_id, issue_date, due_date, status)
+            VALUES (?, ?, ?, ?, 'Issued')
+        ''', (book_id, member_id, issue_date, due_date))
+        
+        if hold:
+            # The reserved copy was already taken out of availability
+            cursor.execute("UPDATE holds SET status='Collected' WHERE hold_id=?", (hold[0],))
+        else:
+            # Update book availability
+            cursor.execute('''
+                UPDATE books SET available = available - 1 WHERE book_id=?
+            ''', (book_id,))
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    
+    return due_date
+
+
+def return_loan(conn, trans_id):
+    """Return a loaned book; returns the hold the copy was passed to, if any"""
+    cursor = conn.cursor()
+    
+    # Write lock first so the same loan cannot be returned twice
+    begin_write(conn)
+    try:
+        # Get transaction details
+        cursor.execute('''
+            SELECT book_id, status FROM transaction_history WHERE transaction_id=?
+        ''', (trans_id,))
+        result = cursor.fetchone()
+        if not result:
+            raise CirculationError("Transaction not found!")
+        
+        book_id, status = result
+        if status == 'Returned':
+            raise CirculationError("Book already returned!")
+        
+        # Update transaction
+        return_date = datetime.now().strftime("%Y-%m-%d")
+        cursor.execute('''
+            UPDATE transactions 
+            SET return_date=?, status='Returned'
+            WHERE transaction_id=?
+        ''', (return_date, trans_id))
+        
+        # Update book availability
+        cursor.execute('''
+            UPDATE books SET available = available + 1 WHERE book_id=?
+        ''', (book_id,))
+        
+        # Hand the copy to the next hold in the same transaction
+        hold = assign_next_hold(cursor, book_id)
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    
+    return hold
+
+
+def update_book_record(conn, book_id, title, author, isbn, category, quantity):
+    """Update a book's details, keeping available in step with quantity"""
+    isbn = isbn or None
+    cursor = conn.cursor()
+    
+    begin_write(conn)
+    try:
+        cursor.execute("SELECT quantity, available, isbn, isbn13 FROM books WHERE book_id=?", (book_id,))
+        result = cursor.fetchone()
+        if not result:
+            raise CirculationError("Book ID not found!")
+        
+        # An unchanged ISBN keeps its key, so legacy ISBNs that don't
+        # validate can still be edited with isbn13 left NULL
+        isbn13 = result[3] if isbn == result[2] else normalize_isbn(isbn)
+        
+        # Copies on loan or set aside for holds stay out of availability
+        on_loan = result[0] - result[1]
+        if quantity < on_loan:
+            raise CirculationError(f"Quantity cannot be less than the {on_loan} copies out on loan!")
+        
+        cursor.execute('''
+            UPDATE books 
+            SET title=?, author=?, isbn=?, isbn13=?, category=?, quantity=?, available=?
+            WHERE book_id=?
+        ''', (title, author, isbn, isbn13, category, quantity, quantity - on_loan, book_id))
+        
+        # New copies go to waiting holds first
+        while assign_next_hold(cursor, book_id):
+            pass
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def assign_next_hold(cursor, book_id):
+    """Reserve an available copy for the oldest waiting hold; caller commits"""
+    cursor.execute("SELECT available FROM books WHERE book_id=?", (book_id,))
+    result = cursor.fetchone()
+    if not result or result[0] <= 0:
+        return None
+    
+    # Skip holds left behind by deleted members
+    cursor.execute('''
+        SELECT hold_id, member_id FROM holds
+        WHERE book_id=? AND status='Waiting'
+          AND EXISTS (SELECT 1 FROM members m WHERE m.member_id = holds.member_id)
+        ORDER BY created_at, hold_id
+        LIMIT 1
+    ''', (book_id,))
+    hold = cursor.fetchone()
+    if not hold:
+        return None
+    
+    ready_date = datetime.now().strftime("%Y-%m-%d")
+    cursor.execute('''
+        UPDATE holds SET status='Ready', ready_date=? WHERE hold_id=?
+    ''', (ready_date, hold[0]))
+    cursor.execute('''
+        UPDATE books SET available = available - 1 WHERE book_id=?
+    ''', (book_id,))
+    return hold
+
+
+def place_hold_record(conn, book_id, member_id):
+    """Queue a hold for a member; returns the hold_id"""
+    cursor = conn.cursor()
+    
+    # Write lock first so two desks cannot queue the same hold twice
+    begin_write(conn)
+    try:
+        cursor.execute("SELECT book_id FROM books WHERE book_id=?", (book_id,))
+        if not cursor.fetchone():
+            raise CirculationError("Book ID not found!")
+        
+        cursor.execute("SELECT member_id FROM members WHERE member_id=?", (member_id,))
+        if not cursor.fetchone():
+            raise CirculationError("Member ID not found!")
+        
+        cursor.execute('''
+            SELECT hold_id FROM holds
+            WHERE book_id=? AND member_id=? AND status IN ('Waiting', 'Ready')
+        ''', (book_id, member_id))
+        if cursor.fetchone():
+            raise CirculationError("Member already has a hold on this book!")
+        
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+            INSERT INTO holds (book_id, member_id, created_at, status)
+            VALUES (?, ?, ?, 'Waiting')
+        ''', (book_id, member_id, created_at))
+        hold_id = cursor.lastrowid
+        
+        # A copy may be on the shelf already (e.g. hold placed before it was needed)
+        assign_next_hold(cursor, book_id)
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    
+    return hold_id
+
+
+def release_hold(cursor, hold_id, book_id, status):
+    """Cancel an open hold and pass any copy set aside for it down the queue; caller commits"""
+    cursor.execute("UPDATE holds SET status='Cancelled' WHERE hold_id=?", (hold_id,))
+    
+    if status == 'Ready':
+        cursor.execute('''
+            UPDATE books SET available = available + 1 WHERE book_id=?
+        ''', (book_id,))
+        assign_next_hold(cursor, book_id)
+
+
+def cancel_hold_record(conn, hold_id):
+    """Cancel a hold, releasing its copy if one was set aside"""
+    cursor = conn.cursor()
+    
+    # Write lock first so a copy is only put back once, even if another desk collects or cancels
+    begin_write(conn)
+    try:
+        cursor.execute("SELECT book_id, status FROM holds WHERE hold_id=?", (hold_id,))
+        result = cursor.fetchone()
+        if not result or result[1] not in ('Waiting', 'Ready'):
+            raise CirculationError("Hold is no longer open!")
+        
+        release_hold(cursor, hold_id, *result)
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def delete_book_record(conn, book_id):
+    """Delete a book, cancelling its open holds"""
+    cursor = conn.cursor()
+    
+    begin_write(conn)
+    try:
+        # No copy goes back on the shelf, so Ready holds are simply closed with the rest
+        cursor.execute('''
+            UPDATE holds SET status='Cancelled'
+            WHERE book_id=? AND status IN ('Waiting', 'Ready')
+        ''', (book_id,))
+        
+        cursor.execute("DELETE FROM books WHERE book_id=?", (book_id,))
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def delete_member_record(conn, member_id):
+    """Delete a member, cancelling their open holds"""
+    cursor = conn.cursor()
+    
+    begin_write(conn)
+    try:
+        cursor.execute('''
+            SELECT hold_id, book_id, status FROM holds
+            WHERE member_id=? AND status IN ('Waiting', 'Ready')
+        ''', (member_id,))
+        for hold_id, book_id, status in cursor.fetchall():
+            release_hold(cursor, hold_id, book_id, status)
+        
+        cursor.execute("DELETE FROM members WHERE member_id=?", (member_id,))
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def rebuild_co_borrows(conn):
+    """Recompute co-borrowing counts from the full transaction history in one pass"""
+    cursor = conn.cursor()
+    
+    begin_write(conn)
+    try:
+        cursor.execute("DELETE FROM co_borrows")
+        
+        # Self-join of distinct (member, book) pairs, aggregated inside SQLite
+        cursor.execute('''
+            INSERT INTO co_borrows (book_id, other_id, members)
+            WITH loans AS (
+                SELECT DISTINCT member_id, book_id FROM transaction_history
+            )
+            SELECT a.book_id, b.book_id, COUNT(*)
+            FROM loans a
+            JOIN loans b ON b.member_id = a.member_id AND b.book_id <> a.book_id
+            GROUP BY a.book_id, b.book_id
+        ''')
+        
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def record_co_borrow(cursor, book_id, member_id):
+    """Update co-borrowing counts for a new loan; caller commits"""
+    # Repeat borrows of the same book do not count again
+    cursor.execute('''
+        SELECT 1 FROM transaction_history WHERE member_id=? AND book_id=? LIMIT 1
+    ''', (member_id, book_id))
+    if cursor.fetchone():
+        return
+    
+    # Pair the new book with every other book the member has borrowed, in both directions
+    cursor.execute('''
+        INSERT INTO co_borrows (book_id, other_id, members)
+        SELECT ?, book_id, 1 FROM transaction_history WHERE member_id=? AND book_id<>?
+        GROUP BY book_id
+        ON CONFLICT (book_id, other_id) DO UPDATE SET members = members + 1
+    ''', (book_id, member_id, book_id))
+    cursor.execute('''
+        INSERT INTO co_borrows (book_id, other_id, members)
+        SELECT book_id, ?, 1 FROM transaction_history WHERE member_id=? AND book_id<>?
+        GROUP BY book_id
+        ON CONFLICT (book_id, other_id) DO UPDATE SET members = members + 1
+    ''', (book_id, member_id, book_id))
+
+
+def also_borrowed(conn, book_id, limit=RECOMMENDATION_COUNT):
+    """Books most often borrowed by members who borrowed this one"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT c.other_id, b.title, c.members
+        FROM co_borrows c
+        JOIN books b ON b.book_id = c.other_id
+        WHERE c.book_id=?
+        ORDER BY c.members DESC
+        LIMIT ?
+    ''', (book_id, limit))
+    return cursor.fetchall()
+
+
+def recommend_for_member(conn, member_id, limit=RECOMMENDATION_COUNT):
+    """Books the member has not borrowed, ranked by co-borrowing with books they have"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT DISTINCT book_id FROM transaction_history WHERE member_id=?", (member_id,))
+    borrowed = {row[0] for row in cursor.fetchall()}
+    
+    # Only each book's top neighbours are read, so the cost does not grow with the whole table
+    scores = {}
+    for book_id in borrowed:
+        cursor.execute('''
+            SELECT other_id, members FROM co_borrows
+            WHERE book_id=?
+            ORDER BY members DESC
+            LIMIT ?
+        ''', (book_id, limit * 4))
+        for other_id, members in cursor.fetchall():
+            if other_id not in borrowed:
+                scores[other_id] = scores.get(other_id, 0) + members
+    
+    top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    
+    results = []
+    for other_id, score in top:
+        cursor.execute("SELECT title FROM books WHERE book_id=?", (other_id,))
+        result = cursor.fetchone()
+        if result:
+            results.append((other_id, result[0], score))
+            if len(results) == limit:
+                break
+    return results
+
+
+def normalize_isbn(isbn):
+    """Return the ISBN-13 form of an ISBN-10 or ISBN-13, or None if blank; raises ValueError if invalid"""
+    digits = str(isbn or '').replace('-', '').replace(' ', '').upper()
+    if not digits:
+        return None
+    
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == 'X'):
+        check = sum((10 - i) * int(d) for i, d in enumerate(digits[:9]))
+        check += 10 if digits[9] == 'X' else int(digits[9])
+        if check % 11:
+            raise ValueError(f"Invalid ISBN-10 check digit: {isbn}")
+        digits = '978' + digits[:9]
+        return digits + str((10 - sum((3 if i % 2 else 1) * int(d) for i, d in enumerate(digits)) % 10) % 10)
+    
+    if len(digits) == 13 and digits.isdigit():
+        if sum((3 if i % 2 else 1) * int(d) for i, d in enumerate(digits)) % 10:
+            raise ValueError(f"Invalid ISBN-13 check digit: {isbn}")
+        return digits
+    
+    raise ValueError(f"ISBN must have 10 or 13 digits: {isbn}")
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and punctuation, and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def title_trigrams(title):
+    """Character trigrams of a normalized title"""
+    text = f" {normalize_text(title)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)} or {text}
+
+
+def minhash_signature(shingles):
+    """MinHash signature of a set of shingles using MINHASH_BANDS * MINHASH_ROWS hash functions"""
+    prime = (1 << 61) - 1
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingles]
+    signature = []
+    for i in range(MINHASH_BANDS * MINHASH_ROWS):
+        # Fixed coefficients keep signatures stable between runs
+        a = 0x9E3779B97F4A7C15 * (i + 1) % prime
+        b = 0x632BE59BD9B4E019 * (i + 7) % prime
+        signature.append(min((a * h + b) % prime for h in hashes))
+    return signature
+
+
+def author_surname(author):
+    """Normalized surname from 'First Last' or 'Last, First' forms"""
+    author = author or ''
+    if ',' in author:
+        author = author.split(',', 1)[0]
+    words = normalize_text(author).split()
+    return words[-1] if words else ''
+
+
+def find_duplicate_books(conn, threshold=DUPLICATE_THRESHOLD):
+    """Group books that share an ISBN or look like the same title by the same author.
+    
+    Books are only compared within buckets keyed on the author's surname and one
+    MinHash band of the title, so the catalogue is scanned in near-linear time
+    instead of comparing every pair. Books whose ISBNs normalize to the same
+    ISBN-13, or share the same legacy ISBN that doesn't validate, are always
+    grouped. Returns a list of book_id groups.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT book_id, title, author, isbn, isbn13 FROM books")
+    
+    trigrams = {}
+    buckets = {}
+    isbn_buckets = {}
+    for book_id, title, author, isbn, isbn13 in cursor.fetchall():
+        # Rows left without isbn13 (e.g. a repeated ISBN at backfill) are normalized here;
+        # legacy ISBNs that don't validate are matched on their bare text
+        if isbn13 is None:
+            try:
+                isbn13 = normalize_isbn(isbn)
+            except ValueError:
+                isbn13 = isbn.replace('-', '').replace(' ', '').upper()
+        if isbn13:
+            isbn_buckets.setdefault(isbn13, []).append(book_id)
+        
+        author_key = author_surname(author)
+        trigrams[book_id] = title_trigrams(title)
+        signature = minhash_signature(trigrams[book_id])
+        for band in range(MINHASH_BANDS):
+            rows = tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS])
+            buckets.setdefault((author_key, band, rows), []).append(book_id)
+    
+    # Union-find over candidate pairs that pass the exact similarity check
+    parent = {}
+    
+    def find(book_id):
+        while parent.get(book_id, book_id) != book_id:
+            book_id = parent[book_id]
+        return book_id
+    
+    def union(first, second):
+        root_a, root_b = find(first), find(second)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    
+    for members in isbn_buckets.values():
+        for other in members[1:]:
+            union(members[0], other)
+    
+    checked = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                if (first, second) in checked:
+                    continue
+                checked.add((first, second))
+                
+                a, b = trigrams[first], trigrams[second]
+                if len(a & b) / len(a | b) >= threshold:
+                    union(first, second)
+    
+    groups = {}
+    for book_id in parent:
+        groups.setdefault(find(book_id), set()).add(book_id)
+    for root, group in groups.items():
+        group.add(root)
+    return sorted(sorted(group) for group in groups.values())
+
+
 class LibraryManagementSystem:
     def __init__(self, root):
         self.root = root
@@ -16,51 +729,20 @@ class LibraryManagementSystem:
         # Create GUI
         self.create_widgets()
         
+        # Schedule periodic archiving and snapshots, running soon after startup if one is overdue
+        self.backup_thread = None
+        last_run = self.last_snapshot_time()
+        if last_run is None:
+            delay = 5000
+        else:
+            elapsed_ms = int((datetime.now().timestamp() - last_run) * 1000)
+            delay = max(5000, BACKUP_INTERVAL_MS - elapsed_ms)
+        self.root.after(delay, self.schedule_maintenance)
+        
     def init_database(self):
         """Initialize SQLite database and create tables"""
-        self.conn = sqlite3.connect('library.db')
+        self.conn = open_database()
         self.cursor = self.conn.cursor()
-        
-        # Create Books table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS books (
-                book_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                author TEXT NOT NULL,
-                isbn TEXT UNIQUE,
-                category TEXT,
-                quantity INTEGER DEFAULT 1,
-                available INTEGER DEFAULT 1
-            )
-        ''')
-        
-        # Create Members table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS members (
-                member_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE,
-                phone TEXT,
-                join_date TEXT
-            )
-        ''')
-        
-        # Create Transactions table
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                book_id INTEGER,
-                member_id INTEGER,
-                issue_date TEXT,
-                due_date TEXT,
-                return_date TEXT,
-                status TEXT DEFAULT 'Issued',
-                FOREIGN KEY (book_id) REFERENCES books(book_id),
-                FOREIGN KEY (member_id) REFERENCES members(member_id)
-            )
-        ''')
-        
-        self.conn.commit()
     
     def create_widgets(self):
         """Create all GUI widgets"""
@@ -80,7 +762,9 @@ class LibraryManagementSystem:
         self.create_books_tab()
         self.create_members_tab()
         self.create_transactions_tab()
+        self.create_holds_tab()
         self.create_search_tab()
+        self.create_maintenance_tab()
     
     def create_books_tab(self):
         """Create Books management tab"""
@@ -128,6 +812,13 @@ class LibraryManagementSystem:
                  bg="#E74C3C", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Clear Fields", command=self.clear_book_fields,
                  bg="#95A5A6", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Find Duplicates", command=self.show_duplicate_books,
+                 bg="#F39C12", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        
+        # Recommendations for the selected book
+        self.book_recs_label = tk.Label(input_frame, text="", font=("Arial", 9), fg="#555555",
+                                        wraplength=900, justify=tk.LEFT)
+        self.book_recs_label.grid(row=4, column=0, columnspan=4, sticky=tk.W)
         
         # Treeview frame
         tree_frame = tk.Frame(books_frame)
@@ -209,6 +900,11 @@ class LibraryManagementSystem:
         tk.Button(button_frame, text="Clear Fields", command=self.clear_member_fields,
                  bg="#95A5A6", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
         
+        # Recommendations for the selected member
+        self.member_recs_label = tk.Label(input_frame, text="", font=("Arial", 9), fg="#555555",
+                                          wraplength=900, justify=tk.LEFT)
+        self.member_recs_label.grid(row=3, column=0, columnspan=4, sticky=tk.W)
+        
         # Treeview frame
         tree_frame = tk.Frame(members_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -281,9 +977,15 @@ class LibraryManagementSystem:
                  bg="#27AE60", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Return Book", command=self.return_book,
                  bg="#3498DB", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Place Hold", command=self.place_hold,
+                 bg="#F39C12", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Clear Fields", command=self.clear_transaction_fields,
                  bg="#95A5A6", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
         
+        self.show_archived_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(button_frame, text="Include archived", variable=self.show_archived_var,
+                      command=self.display_transactions, font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+        
         # Treeview frame
         tree_frame = tk.Frame(trans_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -327,10 +1029,66 @@ class LibraryManagementSystem:
         
         self.display_transactions()
     
+    def create_holds_tab(self):
+        """Create Holds tab listing pending pickups and waiting holds"""
+        holds_frame = ttk.Frame(self.notebook)
+        self.notebook.add(holds_frame, text="Holds")
+        
+        # Buttons frame
+        button_frame = tk.Frame(holds_frame)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        tk.Button(button_frame, text="Cancel Hold", command=self.cancel_hold,
+                 bg="#E74C3C", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Refresh", command=self.display_holds,
+                 bg="#95A5A6", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        
+        # Treeview frame
+        tree_frame = tk.Frame(holds_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        
+        # Scrollbars
+        tree_scroll_y = tk.Scrollbar(tree_frame)
+        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        tree_scroll_x = tk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
+        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Holds Treeview
+        self.holds_tree = ttk.Treeview(tree_frame,
+                                      columns=("Hold ID", "Book ID", "Title", "Member ID", "Member", "Date", "Status"),
+                                      yscrollcommand=tree_scroll_y.set,
+                                      xscrollcommand=tree_scroll_x.set)
+        self.holds_tree.pack(fill=tk.BOTH, expand=True)
+        
+        tree_scroll_y.config(command=self.holds_tree.yview)
+        tree_scroll_x.config(command=self.holds_tree.xview)
+        
+        # Configure columns
+        self.holds_tree['show'] = 'headings'
+        self.holds_tree.heading("Hold ID", text="Hold ID")
+        self.holds_tree.heading("Book ID", text="Book ID")
+        self.holds_tree.heading("Title", text="Title")
+        self.holds_tree.heading("Member ID", text="Member ID")
+        self.holds_tree.heading("Member", text="Member")
+        self.holds_tree.heading("Date", text="Date")
+        self.holds_tree.heading("Status", text="Status")
+        
+        self.holds_tree.column("Hold ID", width=70)
+        self.holds_tree.column("Book ID", width=70)
+        self.holds_tree.column("Title", width=220)
+        self.holds_tree.column("Member ID", width=80)
+        self.holds_tree.column("Member", width=180)
+        self.holds_tree.column("Date", width=140)
+        self.holds_tree.column("Status", width=90)
+        
+        self.display_holds()
+    
     def create_search_tab(self):
         """Create Search tab"""
         search_frame = ttk.Frame(self.notebook)
         self.notebook.add(search_frame, text="Search")
+        self.search_frame = search_frame
         
         # Search frame
         input_frame = tk.LabelFrame(search_frame, text="Search Books", font=("Arial", 12, "bold"), padx=20, pady=20)
@@ -391,6 +1149,46 @@ class LibraryManagementSystem:
         self.search_tree.column("Quantity", width=80)
         self.search_tree.column("Available", width=80)
     
+    def create_maintenance_tab(self):
+        """Create Maintenance tab for backups and compaction"""
+        maint_frame = ttk.Frame(self.notebook)
+        self.notebook.add(maint_frame, text="Maintenance")
+        
+        # Backup frame
+        input_frame = tk.LabelFrame(maint_frame, text="Backup & Compaction", font=("Arial", 12, "bold"), padx=20, pady=20)
+        input_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        tk.Label(input_frame, text=f"Snapshots are saved to '{BACKUP_DIR}' every {BACKUP_INTERVAL_MS // 3600000} hours "
+                                   f"(last {BACKUP_KEEP} kept).", font=("Arial", 10)).grid(row=0, column=0, columnspan=4, sticky=tk.W, pady=5)
+        
+        last_run = self.last_snapshot_time()
+        last_text = datetime.fromtimestamp(last_run).strftime("%Y-%m-%d %H:%M") if last_run else "never"
+        self.backup_status_label = tk.Label(input_frame, text=f"Last backup: {last_text}", font=("Arial", 10))
+        self.backup_status_label.grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=5)
+        
+        # Buttons frame
+        button_frame = tk.Frame(input_frame)
+        button_frame.grid(row=2, column=0, columnspan=4, pady=20)
+        
+        tk.Button(button_frame, text="Backup Now", command=self.backup_database,
+                 bg="#27AE60", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Compact Database", command=self.compact_database,
+                 bg="#3498DB", fg="white", font=("Arial", 10, "bold"), width=15).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Rebuild Recommendations", command=self.rebuild_recommendations,
+                 bg="#F39C12", fg="white", font=("Arial", 10, "bold"), width=22).pack(side=tk.LEFT, padx=5)
+        
+        # Archive frame
+        archive_frame = tk.LabelFrame(maint_frame, text="Transaction Archive", font=("Arial", 12, "bold"), padx=20, pady=20)
+        archive_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        tk.Label(archive_frame, text="Archive returned loans older than (months):", font=("Arial", 10)).grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.archive_months_entry = tk.Entry(archive_frame, width=10, font=("Arial", 10))
+        self.archive_months_entry.insert(0, str(ARCHIVE_AFTER_MONTHS))
+        self.archive_months_entry.grid(row=0, column=1, pady=5, padx=10)
+        
+        tk.Button(archive_frame, text="Archive Now", command=self.archive_now,
+                 bg="#27AE60", fg="white", font=("Arial", 10, "bold"), width=15).grid(row=0, column=2, padx=10)
+    
     # Book operations
     def add_book(self):
         """Add a new book to the library"""
@@ -404,23 +1202,31 @@ class LibraryManagementSystem:
             messagebox.showerror("Error", "Title and Author are required!")
             return
         
+        try:
+            isbn13 = normalize_isbn(isbn)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid ISBN! Enter a valid ISBN-10 or ISBN-13.")
+            return
+        
         try:
             quantity = int(quantity) if quantity else 1
             
             self.cursor.execute('''
-                INSERT INTO books (title, author, isbn, category, quantity, available)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (title, author, isbn, category, quantity, quantity))
+                INSERT INTO books (title, author, isbn, isbn13, category, quantity, available)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (title, author, isbn or None, isbn13, category, quantity, quantity))
             
             self.conn.commit()
             messagebox.showinfo("Success", "Book added successfully!")
             self.clear_book_fields()
             self.display_books()
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             messagebox.showerror("Error", "ISBN already exists!")
         except ValueError:
             messagebox.showerror("Error", "Quantity must be a number!")
         except Exception as e:
+            self.conn.rollback()
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
     def update_book(self):
@@ -441,19 +1247,30 @@ class LibraryManagementSystem:
             messagebox.showerror("Error", "Title and Author are required!")
             return
         
+        # Legacy ISBNs that don't validate may be kept as they are
+        self.cursor.execute("SELECT isbn FROM books WHERE book_id=?", (book_id,))
+        result = self.cursor.fetchone()
+        if not result or (isbn or None) != result[0]:
+            try:
+                normalize_isbn(isbn)
+            except ValueError:
+                messagebox.showerror("Error", "Invalid ISBN! Enter a valid ISBN-10 or ISBN-13, "
+                                              "or clear the field to save the book without one.")
+                return
+        
         try:
             quantity = int(quantity) if quantity else 1
             
-            self.cursor.execute('''
-                UPDATE books 
-                SET title=?, author=?, isbn=?, category=?, quantity=?
-                WHERE book_id=?
-            ''', (title, author, isbn, category, quantity, book_id))
+            update_book_record(self.conn, book_id, title, author, isbn, category, quantity)
             
-            self.conn.commit()
             messagebox.showinfo("Success", "Book updated successfully!")
             self.clear_book_fields()
             self.display_books()
+            self.display_holds()
+        except CirculationError as e:
+            messagebox.showerror("Error", str(e))
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", "ISBN already exists!")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
@@ -468,11 +1285,12 @@ class LibraryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this book?"):
             try:
-                self.cursor.execute("DELETE FROM books WHERE book_id=?", (book_id,))
-                self.conn.commit()
+                delete_book_record(self.conn, book_id)
+                self.reclaim_free_pages()
                 messagebox.showinfo("Success", "Book deleted successfully!")
                 self.clear_book_fields()
                 self.display_books()
+                self.display_holds()
             except Exception as e:
                 messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
@@ -481,7 +1299,9 @@ class LibraryManagementSystem:
         for item in self.books_tree.get_children():
             self.books_tree.delete(item)
         
-        self.cursor.execute("SELECT * FROM books")
+        self.cursor.execute('''
+            SELECT book_id, title, author, IFNULL(isbn, ''), category, quantity, available FROM books
+        ''')
         books = self.cursor.fetchall()
         
         for book in books:
@@ -491,13 +1311,27 @@ class LibraryManagementSystem:
         """Fill entry fields when a book is selected"""
         selected = self.books_tree.selection()
         if selected:
-            values = self.books_tree.item(selected[0])['values']
+            book_id = self.books_tree.item(selected[0])['values'][0]
+            
+            # Read from the database: the treeview turns ISBNs into numbers and drops leading zeros
+            self.cursor.execute('''
+                SELECT title, author, IFNULL(isbn, ''), IFNULL(category, ''), quantity FROM books WHERE book_id=?
+            ''', (book_id,))
+            values = self.cursor.fetchone()
+            if not values:
+                return
+            
             self.clear_book_fields()
-            self.book_title_entry.insert(0, values[1])
-            self.book_author_entry.insert(0, values[2])
-            self.book_isbn_entry.insert(0, values[3])
-            self.book_category_entry.insert(0, values[4])
-            self.book_quantity_entry.insert(0, values[5])
+            self.book_title_entry.insert(0, values[0])
+            self.book_author_entry.insert(0, values[1])
+            self.book_isbn_entry.insert(0, values[2])
+            self.book_category_entry.insert(0, values[3])
+            self.book_quantity_entry.insert(0, values[4])
+            
+            recs = also_borrowed(self.conn, book_id)
+            if recs:
+                titles = ", ".join(f"{title} (#{other_id})" for other_id, title, _ in recs)
+                self.book_recs_label.config(text=f"Members who borrowed this also borrowed: {titles}")
     
     def clear_book_fields(self):
         """Clear all book entry fields"""
@@ -506,6 +1340,33 @@ class LibraryManagementSystem:
         self.book_isbn_entry.delete(0, tk.END)
         self.book_category_entry.delete(0, tk.END)
         self.book_quantity_entry.delete(0, tk.END)
+        self.book_recs_label.config(text="")
+    
+    def show_duplicate_books(self):
+        """List groups of possible duplicate books on the Search tab"""
+        try:
+            groups = find_duplicate_books(self.conn)
+            
+            for item in self.search_tree.get_children():
+                self.search_tree.delete(item)
+            
+            if not groups:
+                messagebox.showinfo("No Results", "No possible duplicates found!")
+                return
+            
+            for group in groups:
+                placeholders = ",".join("?" * len(group))
+                self.cursor.execute(f'''
+                    SELECT book_id, title, author, IFNULL(isbn, ''), category, quantity, available FROM books
+                    WHERE book_id IN ({placeholders})
+                ''', group)
+                for book in self.cursor.fetchall():
+                    self.search_tree.insert('', tk.END, values=book)
+            
+            self.notebook.select(self.search_frame)
+            messagebox.showinfo("Success", f"Found {len(groups)} group(s) of possible duplicates!")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
     # Member operations
     def add_member(self):
@@ -530,8 +1391,10 @@ class LibraryManagementSystem:
             self.clear_member_fields()
             self.display_members()
         except sqlite3.IntegrityError:
+            self.conn.rollback()
             messagebox.showerror("Error", "Email already exists!")
         except Exception as e:
+            self.conn.rollback()
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
     def update_member(self):
@@ -561,7 +1424,11 @@ class LibraryManagementSystem:
             messagebox.showinfo("Success", "Member updated successfully!")
             self.clear_member_fields()
             self.display_members()
+        except sqlite3.IntegrityError:
+            self.conn.rollback()
+            messagebox.showerror("Error", "Email already exists!")
         except Exception as e:
+            self.conn.rollback()
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
     def delete_member(self):
@@ -575,11 +1442,13 @@ class LibraryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this member?"):
             try:
-                self.cursor.execute("DELETE FROM members WHERE member_id=?", (member_id,))
-                self.conn.commit()
+                delete_member_record(self.conn, member_id)
+                self.reclaim_free_pages()
                 messagebox.showinfo("Success", "Member deleted successfully!")
                 self.clear_member_fields()
                 self.display_members()
+                self.display_holds()
+                self.display_books()
             except Exception as e:
                 messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
@@ -603,12 +1472,18 @@ class LibraryManagementSystem:
             self.member_name_entry.insert(0, values[1])
             self.member_email_entry.insert(0, values[2])
             self.member_phone_entry.insert(0, values[3])
+            
+            recs = recommend_for_member(self.conn, values[0])
+            if recs:
+                titles = ", ".join(f"{title} (#{other_id})" for other_id, title, _ in recs)
+                self.member_recs_label.config(text=f"Recommended from similar borrowers: {titles}")
     
     def clear_member_fields(self):
         """Clear all member entry fields"""
         self.member_name_entry.delete(0, tk.END)
         self.member_email_entry.delete(0, tk.END)
         self.member_phone_entry.delete(0, tk.END)
+        self.member_recs_label.config(text="")
     
     # Transaction operations
     def issue_book(self):
@@ -621,52 +1496,31 @@ class LibraryManagementSystem:
             messagebox.showerror("Error", "Book ID and Member ID are required!")
             return
         
+        offer_hold = False
         try:
             book_id = int(book_id)
             member_id = int(member_id)
             due_days = int(due_days) if due_days else 14
             
-            # Check if book exists and is available
-            self.cursor.execute("SELECT available FROM books WHERE book_id=?", (book_id,))
-            result = self.cursor.fetchone()
-            
-            if not result:
-                messagebox.showerror("Error", "Book ID not found!")
-                return
-            
-            if result[0] <= 0:
-                messagebox.showerror("Error", "Book is not available!")
-                return
-            
-            # Check if member exists
-            self.cursor.execute("SELECT member_id FROM members WHERE member_id=?", (member_id,))
-            if not self.cursor.fetchone():
-                messagebox.showerror("Error", "Member ID not found!")
-                return
+            due_date = issue_loan(self.conn, book_id, member_id, due_days)
             
-            # Issue the book
-            issue_date = datetime.now().strftime("%Y-%m-%d")
-            due_date = (datetime.now() + timedelta(days=due_days)).strftime("%Y-%m-%d")
-            
-            self.cursor.execute('''
-                INSERT INTO transactions (book_id, member_id, issue_date, due_date, status)
-                VALUES (?, ?, ?, ?, 'Issued')
-            ''', (book_id, member_id, issue_date, due_date))
-            
-            # Update book availability
-            self.cursor.execute('''
-                UPDATE books SET available = available - 1 WHERE book_id=?
-            ''', (book_id,))
-            
-            self.conn.commit()
             messagebox.showinfo("Success", f"Book issued successfully!\nDue date: {due_date}")
             self.clear_transaction_fields()
             self.display_transactions()
             self.display_books()
+            self.display_holds()
+        except BookUnavailableError:
+            offer_hold = True
+        except CirculationError as e:
+            messagebox.showerror("Error", str(e))
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers!")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        
+        # Outside the handlers so errors from placing the hold are reported by create_hold
+        if offer_hold and messagebox.askyesno("Not Available", "Book is not available!\nPlace a hold for this member?"):
+            self.create_hold(book_id, member_id)
     
     def return_book(self):
         """Return a book"""
@@ -678,39 +1532,18 @@ class LibraryManagementSystem:
         trans_id = self.trans_tree.item(selected[0])['values'][0]
         
         try:
-            # Get transaction details
-            self.cursor.execute('''
-                SELECT book_id, status FROM transactions WHERE transaction_id=?
-            ''', (trans_id,))
-            result = self.cursor.fetchone()
-            
-            if not result:
-                messagebox.showerror("Error", "Transaction not found!")
-                return
-            
-            book_id, status = result
+            hold = return_loan(self.conn, trans_id)
             
-            if status == 'Returned':
-                messagebox.showerror("Error", "Book already returned!")
-                return
-            
-            # Update transaction
-            return_date = datetime.now().strftime("%Y-%m-%d")
-            self.cursor.execute('''
-                UPDATE transactions 
-                SET return_date=?, status='Returned'
-                WHERE transaction_id=?
-            ''', (return_date, trans_id))
-            
-            # Update book availability
-            self.cursor.execute('''
-                UPDATE books SET available = available + 1 WHERE book_id=?
-            ''', (book_id,))
-            
-            self.conn.commit()
-            messagebox.showinfo("Success", "Book returned successfully!")
+            if hold:
+                messagebox.showinfo("Success", f"Book returned successfully!\n"
+                                               f"Reserved for Member ID {hold[1]} (hold #{hold[0]})")
+            else:
+                messagebox.showinfo("Success", "Book returned successfully!")
             self.display_transactions()
             self.display_books()
+            self.display_holds()
+        except CirculationError as e:
+            messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
@@ -719,7 +1552,9 @@ class LibraryManagementSystem:
         for item in self.trans_tree.get_children():
             self.trans_tree.delete(item)
         
-        self.cursor.execute("SELECT * FROM transactions ORDER BY transaction_id DESC")
+        # Archived history is only read when asked for, keeping the default view small
+        table = "transaction_history" if self.show_archived_var.get() else "transactions"
+        self.cursor.execute(f"SELECT * FROM {table} ORDER BY transaction_id DESC")
         transactions = self.cursor.fetchall()
         
         for trans in transactions:
@@ -741,6 +1576,81 @@ class LibraryManagementSystem:
         self.trans_due_days_entry.delete(0, tk.END)
         self.trans_due_days_entry.insert(0, "14")
     
+    # Hold operations
+    def place_hold(self):
+        """Place a hold for the book and member entered on the Issue/Return tab"""
+        book_id = self.trans_book_id_entry.get().strip()
+        member_id = self.trans_member_id_entry.get().strip()
+        
+        if not book_id or not member_id:
+            messagebox.showerror("Error", "Book ID and Member ID are required!")
+            return
+        
+        try:
+            book_id = int(book_id)
+            member_id = int(member_id)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid numbers!")
+            return
+        
+        self.create_hold(book_id, member_id)
+    
+    def create_hold(self, book_id, member_id):
+        """Queue a hold unless the member already has one open for the book"""
+        try:
+            place_hold_record(self.conn, book_id, member_id)
+            
+            messagebox.showinfo("Success", "Hold placed successfully!")
+            self.display_holds()
+            self.display_books()
+        except CirculationError as e:
+            messagebox.showerror("Error", str(e))
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
+    def cancel_hold(self):
+        """Cancel selected hold, releasing its copy if one was set aside"""
+        selected = self.holds_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Please select a hold to cancel!")
+            return
+        
+        hold_id = self.holds_tree.item(selected[0])['values'][0]
+        
+        if messagebox.askyesno("Confirm", "Are you sure you want to cancel this hold?"):
+            try:
+                cancel_hold_record(self.conn, hold_id)
+                
+                messagebox.showinfo("Success", "Hold cancelled successfully!")
+                self.display_holds()
+                self.display_books()
+            except CirculationError as e:
+                messagebox.showerror("Error", str(e))
+            except Exception as e:
+                messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
+    def display_holds(self):
+        """Display pending pickups followed by waiting holds"""
+        for item in self.holds_tree.get_children():
+            self.holds_tree.delete(item)
+        
+        # Both queries are served by the partial indexes, so cost tracks open holds only
+        self.cursor.execute("SELECT * FROM pending_pickups ORDER BY ready_date")
+        holds = self.cursor.fetchall()
+        
+        self.cursor.execute('''
+            SELECT h.hold_id, h.book_id, b.title, h.member_id, m.name, h.created_at, h.status
+            FROM holds h
+            JOIN books b ON b.book_id = h.book_id
+            JOIN members m ON m.member_id = h.member_id
+            WHERE h.status='Waiting'
+            ORDER BY h.book_id, h.created_at
+        ''')
+        holds += self.cursor.fetchall()
+        
+        for hold in holds:
+            self.holds_tree.insert('', tk.END, values=hold)
+    
     # Search operations
     def search_books(self):
         """Search for books"""
@@ -766,8 +1676,23 @@ class LibraryManagementSystem:
         column = column_map[search_by]
         
         try:
-            query = f"SELECT * FROM books WHERE {column} LIKE ?"
-            self.cursor.execute(query, (f"%{search_term}%",))
+            query = f'''
+                SELECT book_id, title, author, IFNULL(isbn, ''), category, quantity, available FROM books
+                WHERE {column} LIKE ?
+            '''
+            params = (f"%{search_term}%",)
+            
+            # Also match the normalized key so any hyphenation or ISBN-10 form finds the book
+            if column == "isbn":
+                try:
+                    isbn13 = normalize_isbn(search_term)
+                except ValueError:
+                    isbn13 = None
+                if isbn13:
+                    query += " OR isbn13 = ?"
+                    params += (isbn13,)
+            
+            self.cursor.execute(query, params)
             results = self.cursor.fetchall()
             
             if results:
@@ -779,6 +1704,151 @@ class LibraryManagementSystem:
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
+    # Maintenance operations
+    def backup_database(self, notify=True):
+        """Start an online backup in a background thread"""
+        if self.backup_thread and self.backup_thread.is_alive():
+            if notify:
+                messagebox.showinfo("Backup", "A backup is already in progress!")
+            return
+        
+        result = {}
+        self.backup_thread = threading.Thread(target=self.run_backup, args=(result,), daemon=True)
+        self.backup_thread.start()
+        self.root.after(200, self.finish_backup, result, notify)
+    
+    def run_backup(self, result):
+        """Copy the database page by page into a new snapshot (runs off the GUI thread)"""
+        try:
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            
+            for src_path, prefix in ((DB_PATH, "library"), (ARCHIVE_PATH, "archive")):
+                dest_path = os.path.join(BACKUP_DIR, f"{prefix}_{stamp}.db")
+                part_path = dest_path + ".part"
+                
+                # Separate connections so the GUI connection is never shared across threads.
+                # Copying a few pages at a time releases the read lock between steps.
+                src = sqlite3.connect(src_path)
+                dst = sqlite3.connect(part_path)
+                try:
+                    src.backup(dst, pages=BACKUP_PAGES_PER_STEP, sleep=0.05)
+                finally:
+                    dst.close()
+                    src.close()
+                os.replace(part_path, dest_path)
+                
+                # Apply retention
+                snapshots = sorted(glob.glob(os.path.join(BACKUP_DIR, f"{prefix}_*.db")))
+                for old in snapshots[:-BACKUP_KEEP]:
+                    os.remove(old)
+            
+            result['path'] = os.path.join(BACKUP_DIR, f"library_{stamp}.db")
+        except Exception as e:
+            result['error'] = str(e)
+    
+    def finish_backup(self, result, notify):
+        """Report the outcome of a backup once the thread has finished"""
+        if self.backup_thread.is_alive():
+            self.root.after(200, self.finish_backup, result, notify)
+            return
+        
+        if 'error' in result:
+            self.backup_status_label.config(text=f"Last backup failed: {result['error']}")
+            if notify:
+                messagebox.showerror("Error", f"Backup failed: {result['error']}")
+            return
+        
+        self.backup_status_label.config(text=f"Last backup: {result['path']}")
+        if notify:
+            messagebox.showinfo("Success", f"Backup saved to {result['path']}")
+    
+    def last_snapshot_time(self):
+        """Modification time of the newest snapshot in BACKUP_DIR, or None if there is none"""
+        snapshots = glob.glob(os.path.join(BACKUP_DIR, "library_*.db"))
+        if not snapshots:
+            return None
+        return max(os.path.getmtime(path) for path in snapshots)
+    
+    def schedule_maintenance(self):
+        """Archive old loans, take a scheduled snapshot and queue the next run"""
+        try:
+            if self.archive_transactions(ARCHIVE_AFTER_MONTHS):
+                self.display_transactions()
+        except sqlite3.Error:
+            self.conn.rollback()
+        self.backup_database(notify=False)
+        self.root.after(BACKUP_INTERVAL_MS, self.schedule_maintenance)
+    
+    def compact_database(self):
+        """Write a compacted copy of the database with VACUUM INTO"""
+        try:
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            dest_path = os.path.join(BACKUP_DIR, f"compact_{stamp}.db")
+            
+            self.conn.commit()
+            self.cursor.execute("VACUUM INTO ?", (dest_path,))
+            messagebox.showinfo("Success", f"Compacted copy saved to {dest_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
+    def archive_transactions(self, months):
+        """Move returned loans older than the given number of months to the archive database"""
+        cutoff = f"-{months} months"
+        
+        # INSERT OR IGNORE keeps a rerun safe if an earlier run stopped between the two steps
+        self.cursor.execute('''
+            INSERT OR IGNORE INTO archive.transactions
+            SELECT * FROM main.transactions
+            WHERE status='Returned' AND return_date < date('now', ?)
+        ''', (cutoff,))
+        
+        self.cursor.execute('''
+            DELETE FROM main.transactions
+            WHERE status='Returned' AND return_date < date('now', ?)
+              AND transaction_id IN (SELECT transaction_id FROM archive.transactions)
+        ''', (cutoff,))
+        moved = self.cursor.rowcount
+        
+        self.conn.commit()
+        self.reclaim_free_pages()
+        return moved
+    
+    def archive_now(self):
+        """Archive old returned loans using the months entered on the Maintenance tab"""
+        months = self.archive_months_entry.get().strip()
+        
+        try:
+            months = int(months)
+            if months < 1:
+                raise ValueError
+            
+            moved = self.archive_transactions(months)
+            messagebox.showinfo("Success", f"{moved} transaction(s) archived!")
+            self.display_transactions()
+        except ValueError:
+            messagebox.showerror("Error", "Months must be a positive number!")
+        except Exception as e:
+            self.conn.rollback()
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
+    def rebuild_recommendations(self):
+        """Recompute co-borrowing counts from the full history"""
+        try:
+            rebuild_co_borrows(self.conn)
+            self.cursor.execute("SELECT COUNT(*) FROM co_borrows")
+            messagebox.showinfo("Success", f"Recommendations rebuilt ({self.cursor.fetchone()[0]} book pairs)!")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
+    def reclaim_free_pages(self):
+        """Return free pages to the filesystem once enough have accumulated"""
+        self.cursor.execute("PRAGMA freelist_count")
+        if self.cursor.fetchone()[0] >= RECLAIM_THRESHOLD:
+            # executescript steps the pragma to completion; execute() frees a single page
+            self.conn.executescript("PRAGMA incremental_vacuum")
+    
     def __del__(self):
         """Close database connection when application closes"""
         if hasattr(self, 'conn'):
@@ -0,0 +1,272 @@
+"""Multi-desk load test for the Library Management System.
+
+Several processes issue, return, search and edit books, and place and cancel
+holds, against one SQLite database at the same time, using the same
+functions as the GUI. At the end it reports throughput, latency percentiles,
+"database is locked" errors and any stock invariant violations.
+
+Example:
+    python stress_test.py --desks 4 --duration 30 --mix issue=35,return=25,search=15,edit=10,hold=10,cancel=5
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import runpy
+import sqlite3
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Library Managemnet System.py")
+OPERATIONS = ("issue", "return", "search", "edit", "hold", "cancel")
+
+# The app file name has spaces, so load it by path instead of importing it
+app = runpy.run_path(APP_PATH, run_name="library_app")
+
+
+def parse_mix(text):
+    """Parse 'issue=40,return=30,...' into weights in OPERATIONS order"""
+    weights = dict.fromkeys(OPERATIONS, 0)
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        weights[name] = int(weight)
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("Mix must give at least one operation a weight")
+    return [weights[op] for op in OPERATIONS]
+
+
+def seed_database(args):
+    """Create the database and fill it with books and members if it is empty"""
+    conn = app['open_database'](args.db, args.archive)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM books")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany('''
+            INSERT INTO books (title, author, isbn, category, quantity, available)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(f"Book {i}", f"Author {i % 50}", None, "Stress", args.copies, args.copies)
+              for i in range(args.books)])
+
+    cursor.execute("SELECT COUNT(*) FROM members")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany('''
+            INSERT INTO members (name, email, phone, join_date)
+            VALUES (?, ?, ?, date('now'))
+        ''', [(f"Member {i}", f"member{i}@stress.test", "") for i in range(args.members)])
+
+    conn.commit()
+    conn.close()
+
+
+def check_invariants(conn):
+    """Return books whose stock figures are inconsistent"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT b.book_id, b.quantity, b.available,
+               (SELECT COUNT(*) FROM transactions t WHERE t.book_id = b.book_id AND t.status = 'Issued'),
+               (SELECT COUNT(*) FROM holds h WHERE h.book_id = b.book_id AND h.status = 'Ready')
+        FROM books b
+    ''')
+    violations = []
+    for book_id, quantity, available, on_loan, reserved in cursor.fetchall():
+        if available < 0:
+            violations.append((book_id, f"available < 0 ({available})"))
+        elif available > quantity:
+            violations.append((book_id, f"available > quantity ({available} > {quantity})"))
+        elif available != quantity - on_loan - reserved:
+            violations.append((book_id, f"available {available} != quantity {quantity} - "
+                                        f"{on_loan} on loan - {reserved} reserved"))
+    return violations
+
+
+def run_operation(conn, op, rng, args):
+    """Carry out one desk operation"""
+    cursor = conn.cursor()
+
+    if op == "issue":
+        book_id = rng.randint(1, args.books)
+        member_id = rng.randint(1, args.members)
+
+        # Some issues collect a copy set aside for a hold
+        if rng.random() < 0.3:
+            cursor.execute('''
+                SELECT book_id, member_id FROM holds
+                WHERE status='Ready' AND book_id >= ?
+                LIMIT 1
+            ''', (book_id,))
+            result = cursor.fetchone()
+            if result:
+                book_id, member_id = result
+
+        app['issue_loan'](conn, book_id, member_id, 14)
+
+    elif op == "return":
+        # Pick any open loan, including ones issued at other desks
+        cursor.execute("SELECT MAX(transaction_id) FROM transactions")
+        last_id = cursor.fetchone()[0] or 0
+        cursor.execute('''
+            SELECT transaction_id FROM transactions
+            WHERE status='Issued' AND transaction_id >= ?
+            LIMIT 1
+        ''', (rng.randint(0, last_id),))
+        result = cursor.fetchone()
+        if result:
+            app['return_loan'](conn, result[0])
+
+    elif op == "search":
+        cursor.execute("SELECT * FROM books WHERE title LIKE ?", (f"%{rng.randint(1, args.books)}%",))
+        cursor.fetchall()
+
+    elif op == "edit":
+        book_id = rng.randint(1, args.books)
+        cursor.execute("SELECT title, author, isbn, category, quantity FROM books WHERE book_id=?", (book_id,))
+        result = cursor.fetchone()
+        if result:
+            title, author, isbn, category, quantity = result
+            quantity = max(1, quantity + rng.choice((-1, 1)))
+            app['update_book_record'](conn, book_id, title, author, isbn, category, quantity)
+
+    elif op == "hold":
+        book_id = rng.randint(1, args.books)
+        member_id = rng.randint(1, args.members)
+        app['place_hold_record'](conn, book_id, member_id)
+
+    elif op == "cancel":
+        # Pick any open hold, including ones placed at other desks
+        cursor.execute("SELECT MAX(hold_id) FROM holds")
+        last_id = cursor.fetchone()[0] or 0
+        cursor.execute('''
+            SELECT hold_id FROM holds
+            WHERE status IN ('Waiting', 'Ready') AND hold_id >= ?
+            LIMIT 1
+        ''', (rng.randint(0, last_id),))
+        result = cursor.fetchone()
+        if result:
+            app['cancel_hold_record'](conn, result[0])
+
+
+def desk_worker(desk, args, weights):
+    """Run one desk until the deadline and return its measurements"""
+    rng = random.Random(args.seed + desk)
+    conn = app['open_database'](args.db, args.archive)
+    conn.execute(f"PRAGMA busy_timeout = {args.busy_timeout}")
+
+    latencies = {op: [] for op in OPERATIONS}
+    counts = {"ok": 0, "rejected": 0, "locked": 0, "errors": 0}
+    error_samples = []
+
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        op = rng.choices(OPERATIONS, weights)[0]
+        start = time.perf_counter()
+        try:
+            run_operation(conn, op, rng, args)
+            counts["ok"] += 1
+        except app['CirculationError']:
+            # Normal outcomes such as "Book is not available!"
+            counts["rejected"] += 1
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                counts["locked"] += 1
+            else:
+                counts["errors"] += 1
+                error_samples.append(f"{op}: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception as e:
+            counts["errors"] += 1
+            error_samples.append(f"{op}: {e!r}")
+            if conn.in_transaction:
+                conn.rollback()
+        latencies[op].append(time.perf_counter() - start)
+
+    conn.close()
+    return latencies, counts, error_samples[:5]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[index]
+
+
+def report(results, violations, args):
+    """Print the combined results of all desks"""
+    latencies = {op: [] for op in OPERATIONS}
+    counts = {"ok": 0, "rejected": 0, "locked": 0, "errors": 0}
+    samples = []
+    for desk_latencies, desk_counts, desk_samples in results:
+        for op in OPERATIONS:
+            latencies[op].extend(desk_latencies[op])
+        for key in counts:
+            counts[key] += desk_counts[key]
+        samples.extend(desk_samples)
+
+    total = sum(counts.values())
+    print(f"\n{args.desks} desks, {args.duration}s, {total} operations "
+          f"({total / args.duration:.1f} ops/s)")
+    print(f"{'Operation':<10}{'Count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for op in OPERATIONS:
+        values = sorted(latencies[op])
+        if not values:
+            continue
+        print(f"{op:<10}{len(values):>8}"
+              f"{percentile(values, 50) * 1000:>10.2f}{percentile(values, 95) * 1000:>10.2f}"
+              f"{percentile(values, 99) * 1000:>10.2f}{values[-1] * 1000:>10.2f}")
+
+    print(f"\nCompleted: {counts['ok']}  Rejected: {counts['rejected']}  "
+          f"Locked: {counts['locked']} ({counts['locked'] / max(total, 1):.2%})  Errors: {counts['errors']}")
+    for sample in samples:
+        print(f"  {sample}")
+
+    if violations:
+        print(f"\nInvariant violations: {len(violations)}")
+        for book_id, problem in violations[:20]:
+            print(f"  Book {book_id}: {problem}")
+    else:
+        print("\nInvariant violations: 0")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-desk load test for the library database")
+    parser.add_argument("--db", default="stress.db", help="database to test (default: stress.db)")
+    parser.add_argument("--archive", default="stress_archive.db", help="archive database (default: stress_archive.db)")
+    parser.add_argument("--desks", type=int, default=4, help="number of desk processes")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run")
+    parser.add_argument("--mix", type=parse_mix, default="issue=35,return=25,search=15,edit=10,hold=10,cancel=5",
+                        help="operation weights, e.g. issue=35,return=25,search=15,edit=10,hold=10,cancel=5")
+    parser.add_argument("--books", type=int, default=100, help="books to seed")
+    parser.add_argument("--copies", type=int, default=2, help="copies of each seeded book")
+    parser.add_argument("--members", type=int, default=500, help="members to seed")
+    parser.add_argument("--busy-timeout", type=int, default=5000, help="SQLite busy timeout in ms")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    args = parser.parse_args()
+
+    seed_database(args)
+
+    with multiprocessing.Pool(args.desks) as pool:
+        pending = pool.starmap_async(desk_worker, [(desk, args, args.mix) for desk in range(args.desks)])
+
+        # Check invariants while the desks are running, not just at the end
+        conn = sqlite3.connect(args.db, timeout=10)
+        violations = {}
+        while not pending.ready():
+            for book_id, problem in check_invariants(conn):
+                violations.setdefault(book_id, problem)
+            pending.wait(1)
+        results = pending.get()
+
+        for book_id, problem in check_invariants(conn):
+            violations.setdefault(book_id, problem)
+        conn.close()
+
+    report(results, sorted(violations.items()), args)
+
+
+if __name__ == "__main__":
+    main()